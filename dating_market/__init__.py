@@ -1,2 +1,3 @@
 from dating_market.market import Market  # noqa: F401
 from dating_market.participants import Participants  # noqa: F401
+from dating_market.scenario import Population, Scenario  # noqa: F401
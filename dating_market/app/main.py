@@ -1,9 +1,7 @@
-import threading
-import time
-from io import StringIO
+import asyncio
 
+import polars as pl
 import streamlit as st
-from loguru import logger
 
 from dating_market.market import Market
 
@@ -14,11 +12,8 @@ st.set_page_config(
 
 st.title("Dating App Market Simulation")
 
-logger.remove()
-log_buffer = StringIO()
-
-logger.add(log_buffer, format="{time} {level} {message}", level="DEBUG")
-log_display = st.empty()
+progress_display = st.empty()
+stats_display = st.empty()
 
 if "market" not in st.session_state:
     st.session_state.market = None
@@ -36,39 +31,23 @@ male_ratio = st.sidebar.slider("Male Ratio", min_value=0.0, max_value=1.0, value
 days = st.sidebar.slider("Number of Days", min_value=1, max_value=30, value=10, step=1)
 
 
-def run_process(n_users, male_ratio):
-    global log_buffer
-    log_buffer.truncate(0)  # Clear buffer
-    log_buffer.seek(0)
-
-    result_container = []
-
-    def process_thread(n_users, male_ratio):
-        market = Market(n_users=n_users, male_ratio=male_ratio)
-        result_container.append(market.run)
-
-    thread = threading.Thread(target=process_thread, daemon=True)
-    thread.start()
+async def run_process(n_users, male_ratio, days):
+    market = Market(n_users=n_users, male_ratio=male_ratio, n_days=days)
+    rows = []
 
-    while thread.is_alive():  # Keep updating UI while process runs
-        log_display.text_area("Logs", log_buffer.getvalue(), height=200, key="log_area")
-        time.sleep(0.5)
+    async for day_stats in market.arun():
+        rows.extend(day_stats)
+        progress_display.progress(market.day / days, text=f"Day {market.day}/{days}")
+        stats_display.dataframe(pl.DataFrame(rows))
 
-    # Final update to capture last logs
-    log_display.text_area("Logs", log_buffer.getvalue(), height=200, key="log_area")
-
-    if result_container:
-        st.session_state.process_result = result_container[0]
-
-    return ()
+    st.session_state.market = market
+    return market
 
 
 if st.sidebar.button("Run Simulation"):
-    run_process(n_users, male_ratio)
-
-    market = st.session_state.process_result[0]
+    market = asyncio.run(run_process(n_users, male_ratio, days))
 
-    df = market.participants.get_users_data()
+    df = market.get_users_data()
 
     # Display the data as a table
     st.write("Simulation data:")
@@ -76,12 +55,11 @@ if st.sidebar.button("Run Simulation"):
 
     # Plot the scatter plot for visualization
     st.write("User Interaction Visualization:")
-    market.participants.plot_scatter(
+    fig = market.plot_scatter(
         df,
         x="attractiveness_score",
         y="match_rate",
         color="gender",
-        size="matches",
         title="Attractiveness vs. Match Rate",
-        labels={"attractiveness_score": "Attractiveness", "match_rate": "Match Rate"},
     )
+    st.plotly_chart(fig)
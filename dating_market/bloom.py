@@ -0,0 +1,96 @@
+import math
+
+import numpy as np
+
+MASK = (1 << 64) - 1
+
+
+def _mix(x: int) -> int:
+    """Scrambles a 64-bit integer (splitmix64 finalizer)."""
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+    return x ^ (x >> 31)
+
+
+def _mix_array(x: np.ndarray) -> np.ndarray:
+    """Scrambles an array of 64-bit integers, consistently with `_mix`."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class BloomFilter:
+    """Fixed-size approximate set of user ids.
+
+    Membership checks never miss an id that was added, but may wrongly report an id that was not
+    with a probability growing with the number of ids added, see `false_positive_rate`.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """Sizes the filter so that its false positive rate is reached once `capacity` ids are added.
+
+        Args:
+            capacity (int): Expected number of ids added.
+            false_positive_rate (float): Target false positive rate at capacity (default is 0.01).
+        """
+        capacity = max(capacity, 1)
+        self.n_bits = max(
+            math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8
+        )
+        self.n_hashes = max(round(self.n_bits / capacity * math.log(2)), 1)
+        self.bits = bytearray(math.ceil(self.n_bits / 8))
+        self.count = 0
+
+    def __len__(self):
+        """Returns the number of ids added."""
+        return self.count
+
+    def _positions(self, user_id: int) -> list[int]:
+        """Returns the bit positions of an id, by double hashing."""
+        h1 = _mix(int(user_id) & MASK)
+        h2 = _mix(h1) | 1
+        return [((h1 + i * h2) & MASK) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, user_id: int):
+        """Adds an id to the filter."""
+        for position in self._positions(user_id):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, user_id: int) -> bool:
+        """Checks if an id may have been added to the filter."""
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(user_id))
+
+    def _positions_many(self, user_ids) -> np.ndarray:
+        """Returns the bit positions of each id of an array, of shape (n_hashes, n_ids)."""
+        h1 = _mix_array(np.asarray(user_ids, dtype=np.int64).astype(np.uint64))
+        h2 = _mix_array(h1) | np.uint64(1)
+        hashes = np.arange(self.n_hashes, dtype=np.uint64)[:, None]
+        return (h1 + hashes * h2) % np.uint64(self.n_bits)
+
+    def add_many(self, user_ids):
+        """Adds every id of an array to the filter."""
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        positions = self._positions_many(user_ids).ravel()
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(bits, positions >> np.uint64(3), masks)
+        self.count += len(user_ids)
+
+    def contains_many(self, user_ids) -> np.ndarray:
+        """Checks if each id of an array may have been added to the filter.
+
+        Args:
+            user_ids (np.ndarray): Ids to check.
+
+        Returns:
+            np.ndarray: Boolean mask of the ids possibly added.
+        """
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        positions = self._positions_many(user_ids)
+        set_bits = (bits[positions >> np.uint64(3)] >> (positions & np.uint64(7))) & 1
+        return set_bits.all(axis=0)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated probability of wrongly reporting an id, given the number of ids added."""
+        return (1 - math.exp(-self.n_hashes * self.count / self.n_bits)) ** self.n_hashes
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class CompatibilityModel:
+    """Computes the like probabilities of swipers for the profiles presented to them.
+
+    The probability of a swiper liking a profile is
+    `1 + like_rate * log(attractiveness_score) + compatibility_weight * <preferences, traits>`,
+    clipped to [0, 1]. The logarithms of the attractiveness scores are cached until the attributes
+    of the users change, and the scores of a day's candidate pairs are computed in blocks.
+    """
+
+    def __init__(
+        self,
+        attractiveness_score: np.ndarray,
+        traits: np.ndarray,
+        preferences: np.ndarray,
+        compatibility_weight: float = 0.0,
+        block_size: int = 65536,
+    ):
+        """Initializes the model with the attributes of the users, indexed by user id.
+
+        Args:
+            attractiveness_score (np.ndarray): Attractiveness score of each user.
+            traits (np.ndarray): Traits vector of each user, of shape (n_users, n_traits).
+            preferences (np.ndarray): Preferences vector of each user, of shape (n_users, n_traits).
+            compatibility_weight (float): Weight of the compatibility in the like probability (default is 0).
+            block_size (int): Number of pairs scored at once, bounding the memory used (default is 65536).
+        """
+        self.compatibility_weight = compatibility_weight
+        self.block_size = block_size
+        self.set_attributes(attractiveness_score, traits, preferences)
+
+    def set_attributes(
+        self, attractiveness_score: np.ndarray, traits: np.ndarray, preferences: np.ndarray
+    ):
+        """Updates the attributes of the users and the cached terms depending on them.
+
+        Args:
+            attractiveness_score (np.ndarray): Attractiveness score of each user.
+            traits (np.ndarray): Traits vector of each user, of shape (n_users, n_traits).
+            preferences (np.ndarray): Preferences vector of each user, of shape (n_users, n_traits).
+        """
+        self.log_attractiveness = np.log(attractiveness_score)
+        self.traits = traits
+        self.preferences = preferences
+
+    @property
+    def uses_compatibility(self) -> bool:
+        """Whether the compatibility between users contributes to the like probabilities."""
+        return self.compatibility_weight != 0 and self.traits.shape[1] > 0
+
+    def compute_thresholds(
+        self, swipers: np.ndarray, targets: np.ndarray, like_rates: np.ndarray
+    ) -> np.ndarray:
+        """Computes the like probabilities of a batch of (swiper, target) pairs.
+
+        Args:
+            swipers (np.ndarray): Ids of the swipers.
+            targets (np.ndarray): Ids of the profiles presented, aligned with the swipers.
+            like_rates (np.ndarray): Current like rate of each user, indexed by user id.
+
+        Returns:
+            np.ndarray: The like probability of each pair.
+        """
+        thresholds = np.empty(len(swipers))
+        for start in range(0, len(swipers), self.block_size):
+            block = slice(start, start + self.block_size)
+            block_swipers, block_targets = swipers[block], targets[block]
+
+            scores = 1 + like_rates[block_swipers] * self.log_attractiveness[block_targets]
+            if self.uses_compatibility:
+                scores += self.compatibility_weight * np.einsum(
+                    "ij,ij->i", self.preferences[block_swipers], self.traits[block_targets]
+                )
+            thresholds[block] = np.clip(scores, 0, 1)
+
+        return thresholds
@@ -1,14 +1,33 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
-import plotly.express as px
-import polars as pl
 from loguru import logger
 
 from dating_market.participants import Participants
+from dating_market.scenario import Population, Scenario
 from dating_market.user import User
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from concurrent.futures import Executor
+
+    import polars as pl
+
 
 class Market:
-    def __init__(self, n_users: int, male_ratio: list[float] | float, n_days: int):
+    def __init__(
+        self,
+        n_users: int,
+        male_ratio: list[float] | float,
+        n_days: int,
+        record_history: bool = True,
+        scenarios: list[Scenario] | None = None,
+        seed: int | None = None,
+        n_traits: int = 0,
+        seen_false_positive_rate: float | None = None,
+    ):
         """
         Initializes the Market instance with the number of users, male-to-female ratio, and number of days.
 
@@ -16,41 +35,154 @@ class Market:
             n_users (int): The total number of users in the market.
             male_ratio (list[float] | float): The male-to-female ratio, can be a list of ratios or a single value.
             n_days (int): The number of days the market will run.
+            record_history (bool, optional): Whether users record their daily history, required by `get_market_data` (default is True).
+            scenarios (list[Scenario] | None, optional): Behavior scenarios simulated for each male-to-female ratio. Scenarios
+                of a same ratio start from one shared population (default is None, a single default scenario).
+            seed (int | None, optional): Seed of the populations and of every participant group, so that scenarios run with
+                common random numbers (default is None, fresh entropy drawn once and shared by every group).
+            n_traits (int, optional): Dimension of the traits and preferences vectors of the users, weighted in the like
+                probability by `Scenario.compatibility_weight` (default is 0, likes only depend on attractiveness).
+            seen_false_positive_rate (float | None, optional): If given, users track the profiles they have seen with Bloom
+                filters of this false positive rate, sized for the run, instead of exact lists. Bounds the memory of long runs
+                at the cost of hiding some unseen profiles, whose estimated rate is reported in `summary` (default is None).
+
+        Raises:
+            ValueError: If several scenarios share the same name, or if a scenario weights the compatibility
+                while users have no traits (`n_traits` is 0).
         """
         self.n_days = n_days
         self.day = 0
         self.n_users = n_users
         self.male_ratio = male_ratio
+        self.record_history = record_history
+        self.scenarios = scenarios
+        # Resolved once so that every group shares the same random streams, even without a seed
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.n_traits = n_traits
+        self.seen_false_positive_rate = seen_false_positive_rate
 
         if isinstance(self.male_ratio, list):
             self.male_ratio.sort()
 
-        self.participants: dict[float, Participants] | Participants = (
-            {m: Participants(n_users=n_users, male_ratio=m) for m in male_ratio}
-            if isinstance(male_ratio, list)
-            else Participants(n_users=n_users, male_ratio=male_ratio)
+        if scenarios is not None and len({s.name for s in scenarios}) != len(scenarios):
+            raise ValueError("Scenarios must have unique names.")
+
+        if n_traits == 0 and any(s.compatibility_weight != 0 for s in scenarios or []):
+            raise ValueError("A non-zero compatibility_weight requires n_traits > 0.")
+
+        self.participants: (
+            dict[float, Participants] | dict[tuple[float, str], Participants] | Participants
+        )
+        if scenarios is not None:
+            self.participants = {
+                (m, s.name): self._create_participants(male_ratio=m, scenario=s)
+                for m in (male_ratio if isinstance(male_ratio, list) else [male_ratio])
+                for s in scenarios
+            }
+        elif isinstance(male_ratio, list):
+            self.participants = {m: self._create_participants(male_ratio=m) for m in male_ratio}
+        else:
+            self.participants = self._create_participants(male_ratio=male_ratio)
+
+    def _create_participants(
+        self, male_ratio: float, scenario: Scenario | None = None
+    ) -> Participants:
+        """
+        Creates a participant group of the market.
+
+        Args:
+            male_ratio (float): The male-to-female ratio of the group.
+            scenario (Scenario | None, optional): The behavior scenario of the group (default is None, the default scenario).
+
+        Returns:
+            Participants: The participant group.
+        """
+        scenario = scenario if scenario is not None else Scenario()
+        return Participants(
+            n_users=self.n_users,
+            male_ratio=male_ratio,
+            record_history=self.record_history,
+            scenario=scenario,
+            seed=self.seed,
+            seen_false_positive_rate=self.seen_false_positive_rate,
+            seen_capacity=self.n_days * scenario.swipe_limit,
         )
 
+    def _iter_participants(self) -> list[tuple[dict, Participants]]:
+        """
+        Lists the participant groups of the market along with the labels identifying them.
+
+        Returns:
+            list[tuple[dict, Participants]]: Pairs of labels (male ratio and scenario) and participant groups.
+        """
+        if self.scenarios is not None:
+            return [
+                ({"male_ratio": m, "scenario": name}, self.participants[(m, name)])
+                for m, name in self.participants
+            ]
+        elif isinstance(self.male_ratio, list):
+            return [({"male_ratio": k}, self.participants[k]) for k in self.participants]
+        else:
+            return [({}, self.participants)]
+
+    def _generate_users(self):
+        """Generates the users of every participant group, sharing one population per male-to-female ratio."""
+        populations: dict[float, Population] = {}
+        for _, participants in self._iter_participants():
+            if participants.male_ratio not in populations:
+                populations[participants.male_ratio] = Population(
+                    n_users=self.n_users,
+                    male_ratio=participants.male_ratio,
+                    n_traits=self.n_traits,
+                    seed=participants.population_seed,
+                )
+            participants.generate_users(population=populations[participants.male_ratio])
+
     def run(self):
         """
         Runs the simulation for a given number of days. In each day, users interact by swiping, liking, and matching.
 
         This method handles the generation of users and the daily interactions based on the specified male-to-female ratio.
         """
-        if isinstance(self.male_ratio, list):
-            for k in self.participants:
-                self.participants[k].generate_users()
-        else:
-            self.participants.generate_users()
+        self._generate_users()
 
         for _ in range(self.n_days):
             self.day += 1
             logger.info(f"📅 Day {self.day}: Users are swiping!")
-            if isinstance(self.male_ratio, list):
-                for k in self.participants:
-                    self.participants[k].run_swipes()
-            else:
-                self.participants.run_swipes()
+            for _, participants in self._iter_participants():
+                participants.run_swipes()
+
+        logger.success("Market run done !")
+
+    async def arun(self, executor: Executor | None = None) -> AsyncIterator[list[dict]]:
+        """
+        Runs the simulation asynchronously, yielding the aggregated activity of each day as soon as it is simulated.
+
+        The users generation and each day's swipes are offloaded to an executor so that the event loop stays free.
+        Cancelling the consuming task (or closing the generator) stops the simulation before the next day starts;
+        a day already handed to the executor finishes in the background.
+
+        Args:
+            executor (Executor | None, optional): The executor running the simulation steps (default is the loop's default executor).
+
+        Yields:
+            list[dict]: One row per participant group and gender with the day's swipes, likes, matches and mean rates.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self._generate_users)
+
+        for _ in range(self.n_days):
+            self.day += 1
+            logger.info(f"📅 Day {self.day}: Users are swiping!")
+            day_stats = []
+            for labels, participants in self._iter_participants():
+                await loop.run_in_executor(executor, participants.run_swipes)
+                day_stats.extend(
+                    {"day": self.day, **labels, **row} for row in participants.get_daily_stats()
+                )
+            yield day_stats
 
         logger.success("Market run done !")
 
@@ -64,6 +196,8 @@ class Market:
         Returns:
             pl.DataFrame: A DataFrame containing user data, including matches, likes, swipes, and other statistics.
         """
+        import polars as pl
+
         data = [
             {
                 "user": users[u].id,
@@ -102,25 +236,51 @@ class Market:
         """
         Retrieves the market data as a DataFrame.
 
-        If there are multiple male-to-female ratios, the method will generate a DataFrame for each ratio and combine them.
-        If there is only one ratio, it generates data for the single participant group.
+        If there are multiple male-to-female ratios or scenarios, the method will generate a DataFrame for each participant
+        group and combine them, labelled by male ratio and scenario. If there is only one group, it generates its data alone.
 
         Returns:
             pl.DataFrame: A concatenated DataFrame containing all market data.
+
+        Raises:
+            ValueError: If the market was created without recording the users history.
         """
-        if isinstance(self.male_ratio, list):
-            data: dict[int, pl.DataFrame] = {
-                k: self._get_market_dataframe_by_run(self.participants[k].users).with_columns(
-                    pl.lit(k).alias("male_ratio")
-                )
-                for k in self.participants
-            }
+        if not self.record_history:
+            raise ValueError(
+                "Market data requires the users history, create the market with record_history=True "
+                "or use `summary` instead."
+            )
 
-            return pl.concat([data[k] for k in data.keys()], how="vertical")
+        import polars as pl
 
-        else:
-            users = self.participants.users
-            return self._get_market_dataframe_by_run(users)
+        data = [
+            self._get_market_dataframe_by_run(participants.users).with_columns(
+                [pl.lit(v).alias(k) for k, v in labels.items()]
+            )
+            for labels, participants in self._iter_participants()
+        ]
+
+        return pl.concat(data, how="vertical")
+
+    def summary(self) -> pl.DataFrame:
+        """
+        Retrieves the daily aggregates maintained while the market runs.
+
+        Unlike `get_market_data`, the summary does not depend on the users history and holds one row per day and gender.
+
+        Returns:
+            pl.DataFrame: A DataFrame containing per-day swipes, likes and matches totals, mean rates, the match rates
+            histogram and quantiles of the likes received, by gender.
+        """
+        import polars as pl
+
+        return pl.DataFrame(
+            [
+                {**labels, **row}
+                for labels, participants in self._iter_participants()
+                for row in participants.summary
+            ]
+        )
 
     def get_users_data(self, nb_decimals: int = 3) -> pl.DataFrame:
         """
@@ -132,15 +292,16 @@ class Market:
         Returns:
             pl.DataFrame: A DataFrame containing user data with optional decimal precision.
         """
-        if isinstance(self.male_ratio, float):
-            return self.participants.get_users_data(nb_decimals=nb_decimals)
-        else:
-            data: dict[int, pl.DataFrame] = {
-                k: self.participants[k].get_users_data().with_columns(pl.lit(k).alias("male_ratio"))
-                for k in self.participants
-            }
+        import polars as pl
+
+        data = [
+            participants.get_users_data(nb_decimals=nb_decimals).with_columns(
+                [pl.lit(v).alias(k) for k, v in labels.items()]
+            )
+            for labels, participants in self._iter_participants()
+        ]
 
-            return pl.concat([data[k] for k in data.keys()], how="vertical")
+        return pl.concat(data, how="vertical")
 
     def plot_scatter(
         self,
@@ -159,6 +320,9 @@ class Market:
         """
         Plots a scatter plot of user data using Plotly. Optionally animates the plot over the days and customizes the appearance.
 
+        The plot is only animated over `slider_column` when the market holds several participant groups.
+        Requires the `plot` extra.
+
         Args:
             df (pl.DataFrame): The DataFrame containing the data to plot.
             x (str): The column name for the x-axis.
@@ -170,66 +334,21 @@ class Market:
             width (int, optional): The width of the plot (default is 900).
             height (int, optional): The height of the plot (default is 600).
         """
-
-        if isinstance(self.male_ratio, list):
-            # Create scatter plot
-            fig = px.scatter(
-                data_frame=df,
-                x=x,
-                y=y,
-                color=color,
-                title=title,
-                animation_frame=slider_column,
-                color_discrete_map=color_map,
-                width=width,
-                height=height,
-            )
-        else:
-            fig = px.scatter(
-                data_frame=df,
-                x=x,
-                y=y,
-                color=color,
-                title=title,
-                color_discrete_map=color_map,
-                width=width,
-                height=height,
-            )
-
-        # Update layout for customization
-        fig.update_layout(
-            title_font=dict(family="Arial", size=20, color="black", weight="bold"),  # Bold title
-            xaxis_title_font=dict(
-                family="Arial", size=14, color="black", weight="bold"
-            ),  # Bold x-axis label
-            yaxis_title_font=dict(
-                family="Arial", size=14, color="black", weight="bold"
-            ),  # Bold y-axis label
-            font=dict(
-                family="Arial", size=12, color="black", weight="bold"
-            ),  # Bold labels and ticks
-            margin=dict(l=50, r=50, t=50, b=50),  # Add margins around the plot
-            xaxis=dict(
-                showgrid=True,
-                zeroline=True,
-                showline=True,  # Show x-axis line
-                linecolor="black",  # Set the x-axis line color
-            ),
-            yaxis=dict(
-                showgrid=True,
-                zeroline=True,
-                showline=True,  # Show y-axis line
-                linecolor="black",  # Set the y-axis line color
-                anchor="x",
-            ),
-            legend_title="Legend",
+        from dating_market.plotting import plot_scatter
+
+        return plot_scatter(
+            df=df,
+            x=x,
+            y=y,
+            color=color,
+            title=title,
+            slider_column=slider_column if isinstance(self.participants, dict) else None,
+            color_map=color_map,
+            width=width,
+            height=height,
+            save_to_html=save_to_html,
+            filename=filename,
         )
-        fig["layout"].pop("updatemenus")
-
-        if save_to_html:
-            fig.write_html(filename)
-
-        return fig
 
     def plot_histogram(
         self,
@@ -249,82 +368,40 @@ class Market:
         category_order=None,
     ):
         """
-        Plots a scatter plot of user data using Plotly. Optionally animates the plot over the days and customizes the appearance.
+        Plots an overlaid histogram of user data using Plotly. Optionally animates the plot over the days and customizes the appearance.
+
+        The plot is only animated over `slider_column` when the market holds several participant groups.
+        Requires the `plot` extra.
 
         Args:
             df (pl.DataFrame): The DataFrame containing the data to plot.
             x (str): The column name for the x-axis.
             y (str): The column name for the y-axis.
-            color (str): The column name used to color the data points.
+            color (str): The column name used to color the bars.
             title (str): The title of the plot.
             slider_column (str | None, optional): The column used for animation frames (default is None).
             color_map (dict[str, str], optional): A mapping for the color of different groups (default maps "Male" to blue and "Female" to pink).
             width (int, optional): The width of the plot (default is 900).
             height (int, optional): The height of the plot (default is 600).
+            bargap (float, optional): The gap between bars (default is 0.1).
+            opacity (float, optional): The opacity of the bars (default is 0.8).
+            category_order (dict | None, optional): The order of categorical values by column (default is None).
         """
-
-        if isinstance(self.male_ratio, list):
-            # Create scatter plot
-            fig = px.histogram(
-                data_frame=df,
-                x=x,
-                y=y,
-                color=color,
-                title=title,
-                animation_frame=slider_column,
-                color_discrete_map=color_map,
-                width=width,
-                height=height,
-                barmode="overlay",
-                opacity=opacity,
-                category_orders=category_order,
-            )
-        else:
-            fig = px.histogram(
-                data_frame=df,
-                x=x,
-                y=y,
-                color=color,
-                title=title,
-                color_discrete_map=color_map,
-                width=width,
-                height=height,
-                barmode="overlay",
-                opacity=opacity,
-                category_orders=category_order,
-            )
-
-        # Update layout for customization
-        fig.update_layout(
-            title_font=dict(family="Arial", size=20, color="black", weight="bold"),  # Bold title
-            xaxis_title_font=dict(
-                family="Arial", size=14, color="black", weight="bold"
-            ),  # Bold x-axis label
-            yaxis_title_font=dict(
-                family="Arial", size=14, color="black", weight="bold"
-            ),  # Bold y-axis label
-            font=dict(
-                family="Arial", size=12, color="black", weight="bold"
-            ),  # Bold labels and ticks
-            margin=dict(l=50, r=50, t=50, b=50),  # Add margins around the plot
-            xaxis=dict(
-                showgrid=True,
-                zeroline=True,
-                showline=True,  # Show x-axis line
-                linecolor="black",  # Set the x-axis line color
-            ),
-            yaxis=dict(
-                showgrid=True,
-                zeroline=True,
-                showline=True,  # Show y-axis line
-                linecolor="black",  # Set the y-axis line color
-                anchor="x",
-            ),
-            legend_title="Legend",
+        from dating_market.plotting import plot_histogram
+
+        return plot_histogram(
+            df=df,
+            x=x,
+            y=y,
+            color=color,
+            title=title,
+            slider_column=slider_column if isinstance(self.participants, dict) else None,
+            color_map=color_map,
+            width=width,
+            height=height,
             bargap=bargap,
+            opacity=opacity,
+            save_to_html=save_to_html,
+            filename=filename,
+            category_order=category_order,
         )
-        fig["layout"].pop("updatemenus")
-
-        if save_to_html:
-            fig.write_html(filename)
-        return fig
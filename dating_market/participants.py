@@ -1,30 +1,74 @@
+from __future__ import annotations
+
+import itertools
 import random
+from typing import TYPE_CHECKING
 
 import numpy as np
-import polars as pl
 from loguru import logger
 
-from dating_market.user import Female, Male, User
+from dating_market.bloom import BloomFilter
+from dating_market.compatibility import CompatibilityModel
+from dating_market.scenario import Population, Scenario
+from dating_market.user import Female, Gender, Male, User
+
+if TYPE_CHECKING:
+    import polars as pl
+
+MATCH_RATE_BINS = np.linspace(0, 1, 11)
+LIKES_RECEIVED_QUANTILES = (0.1, 0.5, 0.9)
 
 
 class Participants:
     """Represents a group of users in the dating market."""
 
-    def __init__(self, n_users: int, male_ratio: float):
+    def __init__(
+        self,
+        n_users: int,
+        male_ratio: float,
+        record_history: bool = True,
+        scenario: Scenario | None = None,
+        seed: int | None = None,
+        n_traits: int = 0,
+        seen_false_positive_rate: float | None = None,
+        seen_capacity: int | None = None,
+    ):
         """Initializes the Participants group with a given number of users and a male ratio.
 
         Args:
             n_users (int): Total number of users.
             male_ratio (float): Proportion of male users in the group.
+            record_history (bool): Whether users record their daily history (default is True).
+            scenario (Scenario | None): Behavior parameters of the users (default is `Scenario()`).
+            seed (int | None): Seed from which independent streams are spawned for the population, the
+                profiles selection and the users decisions (default is None).
+            n_traits (int): Dimension of the traits and preferences vectors of the users drawn when no
+                population is given to `generate_users` (default is 0).
+            seen_false_positive_rate (float | None): If given, users track the profiles they have seen with
+                a Bloom filter of this false positive rate instead of exact lists (default is None).
+            seen_capacity (int | None): Expected number of profiles seen by a user over the run, used to
+                size the Bloom filters (default is None, all the users of the opposite gender).
         """
         self.n_users = n_users
         self.male_ratio = male_ratio
+        self.record_history = record_history
+        self.scenario = scenario if scenario is not None else Scenario()
+        self.seed = seed
+        self.n_traits = n_traits
+        self.seen_false_positive_rate = seen_false_positive_rate
+        self.seen_capacity = seen_capacity
+        self.population_seed, numpy_seed, random_seed = np.random.SeedSequence(seed).spawn(3)
+        self.rng = random.Random(int(random_seed.generate_state(1)[0]))
+        self.np_rng = np.random.default_rng(numpy_seed)
+        self.day = 0
+        self.summary: list[dict] = []
 
         self.males: list[int] = []
         self.females: list[int] = []
         self.users: dict[int, User] = {}
 
-        self.df_users: pl.DataFrame = pl.DataFrame()
+        self.profiles: dict[Gender, np.ndarray] = {}
+        self.compatibility: CompatibilityModel | None = None
 
     def add_user(self, user: User):
         """Adds a user to the participants list.
@@ -38,33 +82,58 @@ class Participants:
             self.females.append(user.id)
         self.users[user.id] = user
 
-    def generate_users(self):
-        """Generates a specified number of users based on the male-to-female ratio."""
+    def generate_users(self, population: Population | None = None):
+        """Generates the users from a population, applying the behavior parameters of the scenario.
 
-        num_males = int(self.n_users * self.male_ratio)
-        num_females = self.n_users - num_males
-        logger.info(f"Generating {self.n_users} users with {self.male_ratio:.0%} of Male")
-
-        for i in range(num_males):
-            self.add_user(
-                Male(
-                    id=len(self.users),
-                    attractiveness_score=max(min(random.gauss(0.5, 0.2), 0.8), 0.2),
-                    like_rate=max(min(random.gauss(0.5, 0.1), 0.8), 0.2),
-                    likes_limit=20,
-                )
+        Args:
+            population (Population | None): Population shared with other scenarios. A new one is drawn
+                from the group's population seed when not given.
+        """
+        if population is None:
+            population = Population(
+                n_users=self.n_users,
+                male_ratio=self.male_ratio,
+                n_traits=self.n_traits,
+                seed=self.population_seed,
             )
 
-        for i in range(num_females):
+        logger.info(
+            f"Generating {population.n_users} users with {population.male_ratio:.0%} of Male "
+            f"for scenario {self.scenario.name}"
+        )
+
+        like_rates = self.scenario.get_like_rates(population.like_rate_noise)
+        n_by_gender = {g: int((population.genders == g).sum()) for g in Gender}
+        for i, gender in enumerate(population.genders):
+            user_class = Male if gender == Gender.male else Female
+            seen_filter = None
+            if self.seen_false_positive_rate is not None:
+                n_profiles = n_by_gender[Gender.female if gender == Gender.male else Gender.male]
+                if self.seen_capacity is not None:
+                    n_profiles = min(n_profiles, self.seen_capacity)
+                seen_filter = BloomFilter(
+                    capacity=n_profiles + 1, false_positive_rate=self.seen_false_positive_rate
+                )
             self.add_user(
-                Female(
-                    id=len(self.users),
-                    attractiveness_score=max(min(random.gauss(0.5, 0.2), 0.8), 0.2),
-                    like_rate=max(min(random.gauss(0.5, 0.1), 0.8), 0.2),
-                    likes_limit=20,
+                user_class(
+                    id=i,
+                    attractiveness_score=float(population.attractiveness_score[i]),
+                    like_rate=float(like_rates[i]),
+                    likes_limit=self.scenario.likes_limit,
+                    record_history=self.record_history,
+                    swipe_limit=self.scenario.swipe_limit,
+                    rng=self.rng,
+                    seen_filter=seen_filter,
                 )
             )
 
+        self.compatibility = CompatibilityModel(
+            attractiveness_score=population.attractiveness_score,
+            traits=population.traits,
+            preferences=population.preferences,
+            compatibility_weight=self.scenario.compatibility_weight,
+        )
+
         logger.success("Users generated !")
 
     def get_potential_profiles(self, user: User) -> list[int]:
@@ -78,29 +147,30 @@ class Participants:
         """
         gender_target = user.get_opposite_gender()
 
-        potential_profiles = self.df_users.filter(
-            ~pl.col("id").is_in(user.seen_users), pl.col("gender") == gender_target.value
-        )
+        potential_profiles = self.profiles[gender_target]
+        potential_profiles = user.get_unseen(potential_profiles)
 
-        potential_profiles = potential_profiles.select(pl.col("id").shuffle())["id"].to_list()
+        potential_profiles = self.np_rng.permutation(potential_profiles).tolist()
 
         if len(potential_profiles) > 0:
             potential_profiles = self.weighted_random_selection(
                 users=potential_profiles,
                 num_picks=min(user.swipe_limit, len(potential_profiles)),
-                probability_ratio_between_best_and_worth=5,
+                probability_ratio_between_best_and_worth=(
+                    self.scenario.probability_ratio_between_best_and_worth
+                ),
             )
         return potential_profiles
 
     def weighted_random_selection(
-        self, users: list[int], num_picks: int, probability_ratio_between_best_and_worth: int
+        self, users: list[int], num_picks: int, probability_ratio_between_best_and_worth: float
     ):
         """Selects users randomly with weighted probabilities based on attractiveness.
 
         Args:
             users (list[int]): List of user IDs.
             num_picks (int): Number of users to select.
-            probability_ratio_between_best_and_worth (int): Ratio influencing selection probabilities.
+            probability_ratio_between_best_and_worth (float): Ratio influencing selection probabilities.
 
         Returns:
             list[int]: Selected user IDs.
@@ -109,41 +179,159 @@ class Participants:
         weights = np.linspace(probability_ratio_between_best_and_worth, 1, n)
         weights /= weights.sum()
 
-        selected_users = np.random.choice(users, size=num_picks, replace=False, p=weights)
+        selected_users = self.np_rng.choice(users, size=num_picks, replace=False, p=weights)
         return list(selected_users)
 
     def run_swipes(self):
-        """Simulates a full round of swiping for all users, updating match and like rates."""
-        self._get_user_attractiveness_data()
+        """Simulates a full round of swiping for all users, updating match and like rates.
+
+        The day's activity is aggregated by gender and appended to the summary.
+        """
+        self.day += 1
+        self._get_profiles_data()
 
+        profiles_to_present = {u: self.get_potential_profiles(self.users[u]) for u in self.users}
+        thresholds = self._get_thresholds(profiles_to_present)
+
+        # Matches also credit the other user, so every counter is reset before anyone swipes
         for u in self.users:
             self.users[u].reset_daily()
 
-            profiles_to_present = self.get_potential_profiles(self.users[u])
+        for u in self.users:
             self.users[u].make_all_swipes(
-                potential_profiles=profiles_to_present, all_users=self.users
+                potential_profiles=profiles_to_present[u],
+                all_users=self.users,
+                thresholds=thresholds[u],
             )
 
+        # Recorded once everyone has swiped, as a match also credits a user who already swiped
+        activity = {g: {"swipes": 0, "likes": 0, "matches": 0} for g in Gender}
+        for u in self.users:
+            self.users[u].record_day()
+
+            user_activity = activity[self.users[u].gender]
+            user_activity["swipes"] += self.users[u].swipes_today
+            user_activity["likes"] += self.users[u].likes_today
+            user_activity["matches"] += self.users[u].match_today
+
+        states = {
+            g: {
+                "like_rate": [],
+                "match_rate": [],
+                "likes_limit": [],
+                "likes_received": [],
+                "seen_false_positive_rate": [],
+            }
+            for g in Gender
+        }
         for u in self.users:
             self.users[u].update_match_rate()
             self.users[u].update_like_rate()
             self.users[u].update_likes_limit()
 
-    def _get_user_attractiveness_data(self):
-        """Collects user attractiveness and like rate data into a DataFrame."""
-        data = [
-            {
-                "id": u,
-                "gender": self.users[u].gender.value,
-                "attractiveness_score": self.users[u].attractiveness_score,
-                "like_rate": self.users[u].like_rate,
-            }
-            for u in self.users
-        ]
+            user_states = states[self.users[u].gender]
+            user_states["like_rate"].append(self.users[u].like_rate)
+            user_states["likes_limit"].append(self.users[u].likes_limit)
+            user_states["likes_received"].append(self.users[u].likes_received_today)
+            user_states["seen_false_positive_rate"].append(
+                self.users[u].seen_filter.false_positive_rate
+                if self.users[u].seen_filter is not None
+                else 0.0
+            )
+            if self.users[u].match_rate != -1:
+                user_states["match_rate"].append(self.users[u].match_rate)
+
+        for gender in Gender:
+            self.summary.append(self._summarize_day(gender, activity[gender], states[gender]))
+
+    def _get_thresholds(self, profiles: dict[int, list[int]]) -> dict[int, list[float] | None]:
+        """Computes the like probabilities of every user for the profiles presented to them in one batch.
+
+        A user's seen profiles only change while they swipe, so the profiles of the whole day can be
+        drawn, and scored, before anyone swipes.
+
+        Args:
+            profiles (dict[int, list[int]]): Profiles presented to each user.
+
+        Returns:
+            dict[int, list[float] | None]: Like probabilities aligned with the profiles of each user, or
+                None when the users were not generated with a compatibility model.
+        """
+        if self.compatibility is None or not profiles:
+            return {u: None for u in profiles}
+
+        ids = np.fromiter(self.users, dtype=np.int64, count=len(self.users))
+        like_rates = np.zeros(ids.max() + 1)
+        like_rates[ids] = [self.users[u].like_rate for u in self.users]
+
+        sizes = [len(p) for p in profiles.values()]
+        swipers = np.repeat(np.fromiter(profiles, dtype=np.int64, count=len(profiles)), sizes)
+        targets = np.fromiter(
+            itertools.chain.from_iterable(profiles.values()), dtype=np.int64, count=sum(sizes)
+        )
+        thresholds = self.compatibility.compute_thresholds(swipers, targets, like_rates).tolist()
 
-        self.df_users = pl.DataFrame(data)
+        offsets = itertools.accumulate(sizes, initial=0)
+        return {
+            u: thresholds[start : start + size] for u, start, size in zip(profiles, offsets, sizes)
+        }
 
-    def get_users_data(self, nb_decimals: int = 3):
+    def _summarize_day(self, gender: Gender, activity: dict[str, int], states: dict[str, list]):
+        """Builds the summary row of the current day for one gender.
+
+        Args:
+            gender (Gender): The gender summarized.
+            activity (dict[str, int]): Total swipes, likes and matches of the day.
+            states (dict[str, list]): End of day like rates, match rates, likes limits, likes received today and
+                estimated false positive rates of the seen profiles filters.
+
+        Returns:
+            dict: The summary row of the day.
+        """
+        n_users = len(states["like_rate"])
+        match_rate_histogram, _ = np.histogram(states["match_rate"], bins=MATCH_RATE_BINS)
+        likes_received_quantiles = (
+            np.quantile(states["likes_received"], LIKES_RECEIVED_QUANTILES)
+            if n_users
+            else [np.nan] * len(LIKES_RECEIVED_QUANTILES)
+        )
+
+        return {
+            "day": self.day,
+            "gender": gender.value,
+            "users": n_users,
+            **activity,
+            "like_rate": float(np.mean(states["like_rate"])) if n_users else np.nan,
+            "match_rate": float(np.mean(states["match_rate"])) if states["match_rate"] else np.nan,
+            "likes_limit": float(np.mean(states["likes_limit"])) if n_users else np.nan,
+            "match_rate_histogram": match_rate_histogram.tolist(),
+            "seen_false_positive_rate": (
+                float(np.mean(states["seen_false_positive_rate"])) if n_users else np.nan
+            ),
+            **{
+                f"likes_received_q{round(q * 100)}": float(v)
+                for q, v in zip(LIKES_RECEIVED_QUANTILES, likes_received_quantiles)
+            },
+        }
+
+    def get_daily_stats(self) -> list[dict]:
+        """Returns the summary of the last simulated day.
+
+        Returns:
+            list[dict]: One row per gender with the day's total swipes, likes and matches, the mean
+                like rate, match rate and likes limit, the match rates histogram, the mean estimated false
+                positive rate of the seen profiles filters and quantiles of the likes received during the day.
+        """
+        return self.summary[-len(Gender) :]
+
+    def _get_profiles_data(self):
+        """Collects the ids of the users of each gender into arrays."""
+        self.profiles = {
+            Gender.male: np.array(self.males, dtype=np.int64),
+            Gender.female: np.array(self.females, dtype=np.int64),
+        }
+
+    def get_users_data(self, nb_decimals: int = 3) -> pl.DataFrame:
         """Exports user data as a Polars DataFrame.
 
         Args:
@@ -152,25 +340,27 @@ class Participants:
         Returns:
             pl.DataFrame: DataFrame containing user statistics.
         """
+        import polars as pl
+
         data = [
             {
                 "user": u,
                 "gender": self.users[u].gender.value,
                 "attractiveness_score": round(self.users[u].attractiveness_score, nb_decimals),
-                "like_rate_start": round(self.users[u].like_rate_history[0], nb_decimals),
+                "like_rate_start": round(self.users[u].like_rate_start, nb_decimals),
                 "like_rate_end": round(self.users[u].like_rate, nb_decimals),
                 "like_rate_evolution": round(
-                    self.users[u].like_rate - self.users[u].like_rate_history[0], nb_decimals
+                    self.users[u].like_rate - self.users[u].like_rate_start, nb_decimals
                 ),
                 "matches": len(self.users[u].matches),
                 "match_rate": round(self.users[u].match_rate, nb_decimals),
                 "likes": len(self.users[u].liked_users),
                 "liked_by": len(self.users[u].liked_by),
                 "liked_by_rate": round(
-                    len(self.users[u].liked_by) / len(self.users[u].seen_by), nb_decimals
+                    len(self.users[u].liked_by) / self.users[u].seen_by_count, nb_decimals
                 ),
-                "seen_by": len(self.users[u].seen_by),
-                "seen_users": len(self.users[u].seen_users),
+                "seen_by": self.users[u].seen_by_count,
+                "seen_users": self.users[u].seen_users_count,
             }
             for u in self.users
         ]
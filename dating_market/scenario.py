@@ -0,0 +1,123 @@
+import numpy as np
+
+from dating_market.user import Gender
+
+
+class Scenario:
+    """Behavior parameters of a simulated market, applied on top of a population."""
+
+    def __init__(
+        self,
+        name: str = "default",
+        likes_limit: int = 20,
+        swipe_limit: int = 50,
+        probability_ratio_between_best_and_worth: float = 5,
+        like_rate_mean: float = 0.5,
+        like_rate_std: float = 0.1,
+        compatibility_weight: float = 0.0,
+        like_rate_min: float = 0.2,
+        like_rate_max: float = 0.8,
+    ):
+        """Initializes the Scenario with the behavior parameters of the users.
+
+        Args:
+            name (str): Name identifying the scenario in the market data.
+            likes_limit (int): Initial and upper daily likes limit of the users.
+            swipe_limit (int): Maximum number of profiles presented to a user each day.
+            probability_ratio_between_best_and_worth (float): Ratio between the selection probabilities
+                of the first and last profiles presented.
+            like_rate_mean (float): Mean of the initial like rate distribution.
+            like_rate_std (float): Standard deviation of the initial like rate distribution.
+            compatibility_weight (float): Weight of the compatibility between users in the like probability.
+            like_rate_min (float): Lower bound of the initial like rates.
+            like_rate_max (float): Upper bound of the initial like rates.
+
+        Raises:
+            ValueError: If `like_rate_mean` is not within [like_rate_min, like_rate_max].
+        """
+        if not like_rate_min <= like_rate_mean <= like_rate_max:
+            raise ValueError(
+                f"like_rate_mean={like_rate_mean} must be within "
+                f"[like_rate_min={like_rate_min}, like_rate_max={like_rate_max}]"
+            )
+
+        self.name = name
+        self.likes_limit = likes_limit
+        self.swipe_limit = swipe_limit
+        self.probability_ratio_between_best_and_worth = probability_ratio_between_best_and_worth
+        self.like_rate_mean = like_rate_mean
+        self.like_rate_std = like_rate_std
+        self.compatibility_weight = compatibility_weight
+        self.like_rate_min = like_rate_min
+        self.like_rate_max = like_rate_max
+
+    def __repr__(self):
+        """Returns a string representation of the scenario."""
+        return (
+            f"Scenario(name={self.name!r}, likes_limit={self.likes_limit}, "
+            f"swipe_limit={self.swipe_limit}, "
+            "probability_ratio_between_best_and_worth="
+            f"{self.probability_ratio_between_best_and_worth}, "
+            f"like_rate_mean={self.like_rate_mean}, like_rate_std={self.like_rate_std}, "
+            f"compatibility_weight={self.compatibility_weight}, "
+            f"like_rate_min={self.like_rate_min}, like_rate_max={self.like_rate_max})"
+        )
+
+    def get_like_rates(self, like_rate_noise: np.ndarray) -> np.ndarray:
+        """Computes the initial like rates of the users from their standard normal draws.
+
+        Args:
+            like_rate_noise (np.ndarray): Standard normal draw of each user.
+
+        Returns:
+            np.ndarray: Initial like rates, clipped to [like_rate_min, like_rate_max].
+        """
+        return np.clip(
+            self.like_rate_mean + self.like_rate_std * like_rate_noise,
+            self.like_rate_min,
+            self.like_rate_max,
+        )
+
+
+class Population:
+    """Immutable snapshot of the users traits, shared by the scenarios of a market."""
+
+    def __init__(
+        self,
+        n_users: int,
+        male_ratio: float,
+        n_traits: int = 0,
+        seed: int | np.random.SeedSequence | None = None,
+    ):
+        """Draws the traits of a population of users.
+
+        The arrays are read-only so that every scenario built on the population shares them without copies.
+        The initial like rates are stored as standard normal draws, so scenarios with different like rate
+        distributions still compare the same users. Traits are drawn with a variance of 1 / n_traits so
+        that the compatibility of two users has a unit variance whatever the dimension.
+
+        Args:
+            n_users (int): Total number of users.
+            male_ratio (float): Proportion of male users in the population.
+            n_traits (int): Dimension of the traits and preferences vectors of the users (default is 0).
+            seed (int | np.random.SeedSequence | None): Seed of the random draws (default is None).
+        """
+        rng = np.random.default_rng(seed)
+        num_males = int(n_users * male_ratio)
+
+        self.n_users = n_users
+        self.male_ratio = male_ratio
+        self.genders = np.array([Gender.male] * num_males + [Gender.female] * (n_users - num_males))
+        self.attractiveness_score = np.clip(rng.normal(0.5, 0.2, n_users), 0.2, 0.8)
+        self.like_rate_noise = rng.standard_normal(n_users)
+        self.traits = rng.normal(0, 1 / np.sqrt(max(n_traits, 1)), (n_users, n_traits))
+        self.preferences = rng.standard_normal((n_users, n_traits))
+
+        for array in (
+            self.genders,
+            self.attractiveness_score,
+            self.like_rate_noise,
+            self.traits,
+            self.preferences,
+        ):
+            array.setflags(write=False)
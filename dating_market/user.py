@@ -5,6 +5,8 @@ from enum import Enum
 
 import numpy as np
 
+from dating_market.bloom import BloomFilter
+
 
 class Gender(Enum):
     """
@@ -21,7 +23,16 @@ class Gender(Enum):
 
 class User:
     def __init__(
-        self, id, gender: Gender, attractiveness_score: float, like_rate: float, likes_limit: int
+        self,
+        id,
+        gender: Gender,
+        attractiveness_score: float,
+        like_rate: float,
+        likes_limit: int,
+        record_history: bool = True,
+        swipe_limit: int = 50,
+        rng: random.Random | None = None,
+        seen_filter: BloomFilter | None = None,
     ):
         """
         Represents a user in the dating app, with attributes such as attractiveness score, like rate, and daily limits.
@@ -32,16 +43,26 @@ class User:
             attractiveness_score (float): User's attractiveness score.
             like_rate (float): Probability of the user liking another user.
             likes_limit (int): Maximum number of likes allowed per day.
+            record_history (bool): Whether the daily histories below are recorded.
+            like_rate_start (float | None): Like rate of the user after their first day, as the first entry of
+                `like_rate_history` (None before the first day).
             swipe_limit (int): Maximum number of swipes per day.
+            rng (random.Random): Random generator driving the user's decisions (default is the `random` module).
+            seen_filter (BloomFilter | None): Approximate set of the seen users replacing the `seen_users` and `seen_by`
+                lists, so that their memory stays bounded (default is None, exact lists).
             upper_likes_limit (int): Upper limit for daily likes.
             lower_likes_limit (int): Lower limit for daily likes.
             match_rate (float): Ratio of matches to liked users.
             likes_today (int): Count of likes given today.
+            likes_received_today (int): Count of likes received today.
             match_today (int): Count of matches today.
             swipes_today (int): Count of swipes today.
             matches (list[int]): List of user IDs the user has matched with.
             liked_users (list[int]): List of user IDs the user has liked.
-            seen_users (list[int]): List of user IDs the user has seen.
+            seen_users (list[int]): List of user IDs the user has seen, empty with a `seen_filter`.
+            seen_by (list[int]): List of user IDs who have seen the user, empty with a `seen_filter`.
+            seen_users_count (int): Count of users the user has seen, including themselves.
+            seen_by_count (int): Count of users who have seen the user.
             like_rate_history (list[float]): History of like rates.
             match_rate_history (list[float]): History of match rates.
             likes_limit_history (list[float]): History of likes limits.
@@ -54,19 +75,29 @@ class User:
         self.attractiveness_score = attractiveness_score
         self.like_rate = like_rate
         self.likes_limit = likes_limit
-        self.swipe_limit: int = 50
+        self.record_history = record_history
+        self.like_rate_start: float | None = None
+        self.swipe_limit = swipe_limit
+        self.rng = rng if rng is not None else random
+        self.seen_filter = seen_filter
         self.upper_likes_limit = likes_limit
         self.lower_likes_limit = int(likes_limit / 3)
         self.match_rate: float = -1
         self.likes_today: int = 0
+        self.likes_received_today: int = 0
         self.match_today: int = 0
         self.swipes_today: int = 0
 
         self.matches: list[int] = []
         self.liked_users: list[int] = []
-        self.seen_users: list[int] = [self.id]
+        self.seen_users: list[int] = [self.id] if seen_filter is None else []
         self.liked_by: list[int] = []
         self.seen_by: list[int] = []
+        self.seen_users_count: int = 1
+        self.seen_by_count: int = 0
+
+        if seen_filter is not None:
+            seen_filter.add(self.id)
 
         self.like_rate_history: list[float] = []
         self.match_rate_history: list[float] = []
@@ -96,7 +127,7 @@ class User:
     def update_likes_limit(self):
         """Adjusts the user's daily like limit based on the match rate."""
         if self.match_rate != -1:
-            step = int(self.likes_limit * abs(random.gauss(0, 1)))
+            step = int(self.likes_limit * abs(self.rng.gauss(0, 1)))
             if self.match_rate >= 0.33:
                 if self.likes_limit - step >= self.lower_likes_limit:
                     self.likes_limit -= step
@@ -104,29 +135,35 @@ class User:
                 if self.likes_limit + step <= self.upper_likes_limit:
                     self.likes_limit += step
 
-        self.likes_limit_history.append(self.likes_limit)
+        if self.record_history:
+            self.likes_limit_history.append(self.likes_limit)
 
     def update_like_rate(self):
         """Updates the like_rate with some randomness based on match rate"""
         if self.match_rate != -1:
-            increment = self.like_rate * abs(random.gauss(0, 0.1))
+            increment = self.like_rate * abs(self.rng.gauss(0, 0.1))
             if self.match_rate >= 0.33:
                 self.like_rate -= increment
             elif self.match_rate <= 0.1:
                 self.like_rate += increment
 
         self.like_rate = min(max(self.like_rate, 0), 1)
-        self.like_rate_history.append(self.like_rate)
+        if self.like_rate_start is None:
+            self.like_rate_start = self.like_rate
+        if self.record_history:
+            self.like_rate_history.append(self.like_rate)
 
     def update_match_rate(self):
         """Updates the match rate based on past interactions."""
         if len(self.liked_users) > 0:
             self.match_rate = len(self.matches) / len(self.liked_users)
-            self.match_rate_history.append(self.match_rate)
+            if self.record_history:
+                self.match_rate_history.append(self.match_rate)
 
     def reset_daily(self):
         """Resets swipe, like, and match counters at the start of a new day."""
         self.likes_today = 0
+        self.likes_received_today = 0
         self.match_today = 0
         self.swipes_today = 0
 
@@ -160,41 +197,74 @@ class User:
         """Determines if the other user has also liked the user."""
         return self.id in other_user.liked_users
 
-    def swipe(self, other_user: User):
-        """Determines if the user swipes right (likes the other user)."""
+    def swipe(self, other_user: User, threshold: float | None = None):
+        """Determines if the user swipes right (likes the other user), with a precomputed like probability if given."""
         self.swipes_today += 1
-        threshold = self.compute_threshold_like_rate(other_user.attractiveness_score)
-        liked = random.random() < threshold
+        if threshold is None:
+            threshold = self.compute_threshold_like_rate(other_user.attractiveness_score)
+        liked = self.rng.random() < threshold
         if liked:
             self.likes_today += 1
             other_user.liked_by.append(self.id)
+            other_user.likes_received_today += 1
             self.liked_users.append(other_user.id)
         return liked
 
-    def make_all_swipes(self, potential_profiles: list[int], all_users: dict[str, User]):
-        """Makes swipes on all other users."""
-        for user_id in potential_profiles:
+    def get_unseen(self, user_ids: np.ndarray) -> np.ndarray:
+        """Filters out the users already seen from an array of user IDs."""
+        if self.seen_filter is not None:
+            return user_ids[~self.seen_filter.contains_many(user_ids)]
+        return user_ids[~np.isin(user_ids, self.seen_users)]
+
+    def mark_seen(self, other_users: list[User]):
+        """Registers that the user has seen other users."""
+        if self.seen_filter is not None:
+            self.seen_filter.add_many([other_user.id for other_user in other_users])
+        else:
+            for other_user in other_users:
+                self.seen_users.append(other_user.id)
+                other_user.seen_by.append(self.id)
+
+        self.seen_users_count += len(other_users)
+        for other_user in other_users:
+            other_user.seen_by_count += 1
+
+    def make_all_swipes(
+        self,
+        potential_profiles: list[int],
+        all_users: dict[str, User],
+        thresholds: list[float] | None = None,
+    ):
+        """Makes swipes on unseen users, as filtered by `get_unseen`, with their like probabilities if given."""
+        if thresholds is None:
+            thresholds = [None] * len(potential_profiles)
+
+        newly_seen = []
+        for user_id, threshold in zip(potential_profiles, thresholds):
             if self.get_swipe_limit():
                 break
-            if user_id not in self.seen_users:
-                liked = self.swipe(all_users[user_id])
-                if liked:
-                    if self.is_reciprocal(all_users[user_id]):
-                        self.match(user_id, all_users[user_id])
+            liked = self.swipe(all_users[user_id], threshold)
+            if liked:
+                if self.is_reciprocal(all_users[user_id]):
+                    self.match(user_id, all_users[user_id])
+
+            newly_seen.append(all_users[user_id])
 
-                self.seen_users.append(user_id)
-                all_users[user_id].seen_by.append(self.id)
+        self.mark_seen(newly_seen)
 
-        self.match_by_days.append(self.match_today)
-        self.likes_by_day.append(self.likes_today)
-        self.swipes_by_day.append(self.swipes_today)
+    def record_day(self):
+        """Records the day's swipes, likes and matches, once every user has swiped."""
+        if self.record_history:
+            self.match_by_days.append(self.match_today)
+            self.likes_by_day.append(self.likes_today)
+            self.swipes_by_day.append(self.swipes_today)
 
 
 class Male(User):
-    def __init__(self, id, attractiveness_score, like_rate, likes_limit):
-        super().__init__(id, Gender.male, attractiveness_score, like_rate, likes_limit)
+    def __init__(self, id, attractiveness_score, like_rate, likes_limit, **kwargs):
+        super().__init__(id, Gender.male, attractiveness_score, like_rate, likes_limit, **kwargs)
 
 
 class Female(User):
-    def __init__(self, id, attractiveness_score, like_rate, likes_limit):
-        super().__init__(id, Gender.female, attractiveness_score, like_rate, likes_limit)
+    def __init__(self, id, attractiveness_score, like_rate, likes_limit, **kwargs):
+        super().__init__(id, Gender.female, attractiveness_score, like_rate, likes_limit, **kwargs)
@@ -1,6 +1,11 @@
 import functools
+import subprocess
+import sys
 import time
 
+OPTIONAL_MODULES = ("polars", "plotly", "streamlit")
+IMPORT_TIME_BUDGET = 0.3
+
 
 def timeit(func):
     """Decorator to measure the execution time"""
@@ -17,3 +22,48 @@ def timeit(func):
         return result
 
     return wrapper
+
+
+def measure_import_time(module: str = "dating_market", runs: int = 5) -> tuple[float, list[str]]:
+    """Measures the cold import time of a module, each run in a fresh interpreter.
+
+    Args:
+        module (str): The module to import (default is "dating_market").
+        runs (int): The number of interpreters spawned, the fastest run is kept (default is 5).
+
+    Returns:
+        tuple[float, list[str]]: The import time in seconds and the optional modules loaded by the import.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {OPTIONAL_MODULES!r} if m in sys.modules))\n"
+    )
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout.splitlines()
+        timings.append(float(output[0]))
+        loaded = [m for m in output[1].split(",") if m] if len(output) > 1 else []
+
+    return min(timings), loaded
+
+
+def check_import_time(module: str = "dating_market", budget: float = IMPORT_TIME_BUDGET):
+    """Checks that importing a module stays within its time budget and loads no optional module.
+
+    Args:
+        module (str): The module to import (default is "dating_market").
+        budget (float): The maximum import time in seconds (default is `IMPORT_TIME_BUDGET`).
+
+    Raises:
+        RuntimeError: If the import loads an optional module or exceeds the budget.
+    """
+    import_time, loaded = measure_import_time(module)
+    if loaded:
+        raise RuntimeError(f"Importing {module} loads optional modules: {', '.join(loaded)}")
+    if import_time > budget:
+        raise RuntimeError(f"Importing {module} takes {import_time:.3f}s, budget is {budget:.3f}s")
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
+
+from dating_market.market import Market
+from dating_market.user import Gender
+
+if TYPE_CHECKING:
+    import polars as pl
+
+ENGINES: dict[str, dict] = {
+    "reference": {},
+    "bloom": {"seen_false_positive_rate": 0.01},
+}
+CONTINUOUS_METRICS = ("like_rate",)
+DISCRETE_METRICS = ("matches", "likes", "likes_limit")
+BALANCE_METRICS = ("match_imbalance",)
+
+
+class EngineComparison:
+    """Outcome of the comparison of a candidate engine with the reference engine."""
+
+    def __init__(
+        self,
+        report: pl.DataFrame,
+        reference_time: float,
+        candidate_time: float,
+        alpha: float,
+        tolerance: float,
+    ):
+        """Initializes the comparison with the tests report and the run times of both engines.
+
+        Args:
+            report (pl.DataFrame): One row per day, gender and metric with the test statistic, its p-value,
+                the means of both engines and whether the row passed.
+            reference_time (float): Total run time of the reference engine in seconds.
+            candidate_time (float): Total run time of the candidate engine in seconds.
+            alpha (float): Family-wise significance level of the tests.
+            tolerance (float): Maximum difference allowed between the means of both engines, in pooled
+                standard deviations.
+        """
+        self.report = report
+        self.reference_time = reference_time
+        self.candidate_time = candidate_time
+        self.alpha = alpha
+        self.tolerance = tolerance
+
+    def __str__(self):
+        """Returns a string representation of the comparison."""
+        failures = self.report.filter(~self.report["passed"]).height
+        return (
+            "EngineComparison:\n"
+            f"  Reference time: {self.reference_time:.3f}s\n"
+            f"  Candidate time: {self.candidate_time:.3f}s\n"
+            f"  Speedup: {self.speedup:.2f}x\n"
+            f"  Failed checks: {failures}/{self.report.height}\n"
+        )
+
+    @property
+    def speedup(self) -> float:
+        """Ratio of the reference run time to the candidate run time."""
+        return self.reference_time / self.candidate_time
+
+    @property
+    def passed(self) -> bool:
+        """Whether every day, gender and metric passed both the statistical test and the tolerance."""
+        return bool(self.report["passed"].all())
+
+    def assert_equivalent(self, min_speedup: float | None = None):
+        """Checks that the candidate engine is statistically equivalent to, and optionally faster than, the reference.
+
+        Args:
+            min_speedup (float | None): Minimum speedup required from the candidate engine (default is None).
+
+        Raises:
+            AssertionError: If a check failed or the candidate engine is too slow.
+        """
+        failures = self.report.filter(~self.report["passed"])
+        if failures.height > 0:
+            raise AssertionError(f"Engines differ on {failures.height} checks:\n{failures}")
+        if min_speedup is not None and self.speedup < min_speedup:
+            raise AssertionError(
+                f"Speedup of {self.speedup:.2f}x, expected at least {min_speedup:.2f}x"
+            )
+
+
+def run_engine(
+    engine: dict, n_users: int, male_ratio: float, n_days: int, seeds: list[int]
+) -> tuple[dict[tuple[int, str, str], list[float]], float]:
+    """Runs one seeded market per seed with an engine and collects the per-day values of each user.
+
+    Args:
+        engine (dict): Keyword arguments of `Market` defining the engine.
+        n_users (int): The total number of users of each market.
+        male_ratio (float): The male-to-female ratio of each market.
+        n_days (int): The number of days each market runs.
+        seeds (list[int]): The seeds of the markets.
+
+    Returns:
+        tuple[dict[tuple[int, str, str], list[float]], float]: The end of day values of every user of every
+            market by day, gender and metric, the gap between the male and female match totals of every market
+            by day, and the total run time in seconds.
+    """
+    samples: dict[tuple[int, str, str], list[float]] = defaultdict(list)
+    run_time = 0.0
+
+    for seed in seeds:
+        market = Market(n_users=n_users, male_ratio=male_ratio, n_days=n_days, seed=seed, **engine)
+
+        start_time = time.perf_counter()
+        market.run()
+        run_time += time.perf_counter() - start_time
+
+        for _, participants in market._iter_participants():
+            for user in participants.users.values():
+                histories = {
+                    "matches": user.match_by_days,
+                    "likes": user.likes_by_day,
+                    "like_rate": user.like_rate_history,
+                    "likes_limit": user.likes_limit_history,
+                }
+                for metric, history in histories.items():
+                    for day, value in enumerate(history, start=1):
+                        samples[(day, user.gender.value, metric)].append(value)
+
+            if market.record_history:
+                # A match credits both users, so the daily totals of both genders must be equal
+                match_totals = {gender: np.zeros(n_days, dtype=int) for gender in Gender}
+                for user in participants.users.values():
+                    match_totals[user.gender] += user.match_by_days
+                imbalance = np.abs(match_totals[Gender.male] - match_totals[Gender.female])
+                for day, value in enumerate(imbalance, start=1):
+                    samples[(day, "All", "match_imbalance")].append(value)
+
+    return samples, run_time
+
+
+def _test_samples(
+    metric: str, reference: np.ndarray, candidate: np.ndarray
+) -> tuple[str, float, float]:
+    """Tests whether two samples of a metric come from the same distribution.
+
+    Continuous metrics are compared with a two-sample Kolmogorov-Smirnov test. Discrete metrics are binned on
+    the quantiles of the pooled samples and compared with a chi-square test of homogeneity. Balance metrics
+    must be exactly zero in both samples, their statistic is the largest value and their p-value 1 or 0.
+
+    Returns:
+        tuple[str, float, float]: The name of the test, its statistic and its p-value.
+    """
+    from scipy import stats
+
+    if metric in BALANCE_METRICS:
+        statistic = float(max(reference.max(), candidate.max()))
+        return "exact", statistic, float(statistic == 0)
+    if metric in CONTINUOUS_METRICS:
+        result = stats.ks_2samp(reference, candidate)
+        return "ks", float(result.statistic), float(result.pvalue)
+
+    pooled = np.concatenate([reference, candidate])
+    edges = np.unique(np.quantile(pooled, np.linspace(0, 1, 11)))
+    if len(edges) < 3:
+        edges = np.unique(pooled)
+        if len(edges) < 2:
+            return "chi2", 0.0, 1.0
+        edges = np.append(edges, edges[-1] + 1)
+
+    table = np.array([np.histogram(reference, edges)[0], np.histogram(candidate, edges)[0]])
+    table = table[:, table.sum(axis=0) > 0]
+    if table.shape[1] < 2:
+        return "chi2", 0.0, 1.0
+
+    result = stats.chi2_contingency(table)
+    return "chi2", float(result.statistic), float(result.pvalue)
+
+
+def compare_engines(
+    candidate: dict | str,
+    reference: dict | str = "reference",
+    n_users: int = 500,
+    male_ratio: float = 0.5,
+    n_days: int = 10,
+    seeds: list[int] | None = None,
+    seed_offset: int = 1_000_000,
+    alpha: float = 0.01,
+    tolerance: float = 0.3,
+) -> EngineComparison:
+    """Runs a candidate engine and the reference engine on seeded markets and compares their dynamics.
+
+    The candidate runs on the seeds shifted by `seed_offset`, so that both samples are independent.
+
+    For each day, gender and metric (matches, likes, like_rate and likes_limit), the values of all the users
+    are compared with a KS or chi-square test, at a Bonferroni-corrected level so that `alpha` bounds the
+    probability of any false alarm, and the difference of their means, in pooled standard deviations, must
+    stay within `tolerance`. The daily male and female match totals of every market must also be equal.
+    Requires the `validation` extra.
+
+    Args:
+        candidate (dict | str): The engine validated, as `Market` keyword arguments or a name of `ENGINES`.
+        reference (dict | str): The engine of reference (default is "reference").
+        n_users (int): The total number of users of each market (default is 500).
+        male_ratio (float): The male-to-female ratio of each market (default is 0.5).
+        n_days (int): The number of days each market runs (default is 10).
+        seeds (list[int] | None): The seeds of the reference markets (default is None, seeds 0 to 4).
+        seed_offset (int): The shift applied to the seeds of the candidate markets (default is 1 000 000).
+        alpha (float): Family-wise significance level of the tests (default is 0.01).
+        tolerance (float): Maximum difference between the means of both engines, in pooled standard deviations
+            (default is 0.3, about twice the noise between independent runs of 300 users over 4 seeds).
+
+    Returns:
+        EngineComparison: The report of the tests and the run times of both engines.
+
+    Raises:
+        ValueError: If the seeds of both engines overlap, or if the engines record no daily history.
+    """
+    import polars as pl
+
+    seeds = list(seeds) if seeds is not None else list(range(5))
+    candidate_seeds = [seed + seed_offset for seed in seeds]
+    if set(seeds) & set(candidate_seeds):
+        raise ValueError("The seeds of both engines overlap, use a larger seed_offset.")
+    candidate = ENGINES[candidate] if isinstance(candidate, str) else candidate
+    reference = ENGINES[reference] if isinstance(reference, str) else reference
+
+    logger.info(f"Running reference engine {reference} on {len(seeds)} markets")
+    reference_samples, reference_time = run_engine(reference, n_users, male_ratio, n_days, seeds)
+    logger.info(f"Running candidate engine {candidate} on {len(seeds)} markets")
+    candidate_samples, candidate_time = run_engine(
+        candidate, n_users, male_ratio, n_days, candidate_seeds
+    )
+
+    keys = sorted(reference_samples.keys() & candidate_samples.keys())
+    if not keys:
+        raise ValueError(
+            "No daily values to compare, engines must record the users history (record_history=True)."
+        )
+    level = alpha / max(len(keys), 1)
+
+    rows = []
+    for day, gender, metric in keys:
+        reference_values = np.asarray(reference_samples[(day, gender, metric)], dtype=float)
+        candidate_values = np.asarray(candidate_samples[(day, gender, metric)], dtype=float)
+
+        test, statistic, p_value = _test_samples(metric, reference_values, candidate_values)
+        reference_mean, candidate_mean = reference_values.mean(), candidate_values.mean()
+        scale = np.sqrt((reference_values.var() + candidate_values.var()) / 2)
+        mean_difference = abs(candidate_mean - reference_mean) / scale if scale > 0 else 0.0
+
+        rows.append(
+            {
+                "day": day,
+                "gender": gender,
+                "metric": metric,
+                "test": test,
+                "statistic": statistic,
+                "p_value": p_value,
+                "reference_mean": float(reference_mean),
+                "candidate_mean": float(candidate_mean),
+                "mean_difference": float(mean_difference),
+                "passed": bool(p_value >= level and mean_difference <= tolerance),
+            }
+        )
+
+    comparison = EngineComparison(
+        report=pl.DataFrame(rows),
+        reference_time=reference_time,
+        candidate_time=candidate_time,
+        alpha=alpha,
+        tolerance=tolerance,
+    )
+    logger.success(
+        f"Engines compared: {comparison.speedup:.2f}x speedup, passed={comparison.passed}"
+    )
+    return comparison
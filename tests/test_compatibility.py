@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from loguru import logger
+
+from dating_market import Market, Population, Scenario
+from dating_market.compatibility import CompatibilityModel
+
+logger.remove()
+
+POPULATION = Population(n_users=200, male_ratio=0.5, n_traits=4, seed=0)
+SWIPERS = np.repeat(np.arange(100), 10)
+TARGETS = np.random.default_rng(0).integers(100, 200, len(SWIPERS))
+LIKE_RATES = np.full(200, 0.5)
+
+
+def compute_thresholds(compatibility_weight):
+    model = CompatibilityModel(
+        POPULATION.attractiveness_score,
+        POPULATION.traits,
+        POPULATION.preferences,
+        compatibility_weight=compatibility_weight,
+        block_size=64,
+    )
+    return model.compute_thresholds(SWIPERS, TARGETS, LIKE_RATES)
+
+
+def test_zero_weight_reproduces_attractiveness_only_formula():
+    expected = np.clip(1 + 0.5 * np.log(POPULATION.attractiveness_score[TARGETS]), 0, 1)
+
+    np.testing.assert_allclose(compute_thresholds(0.0), expected)
+
+
+def test_weight_changes_like_probabilities():
+    thresholds = compute_thresholds(0.5)
+    compatibility = np.einsum(
+        "ij,ij->i", POPULATION.preferences[SWIPERS], POPULATION.traits[TARGETS]
+    )
+    expected = np.clip(
+        1 + 0.5 * np.log(POPULATION.attractiveness_score[TARGETS]) + 0.5 * compatibility, 0, 1
+    )
+
+    np.testing.assert_allclose(thresholds, expected)
+    assert not np.allclose(thresholds, compute_thresholds(0.0))
+
+
+def test_weight_changes_like_rates():
+    market = Market(
+        n_users=200,
+        male_ratio=0.5,
+        n_days=3,
+        scenarios=[Scenario("attractiveness"), Scenario("compatibility", compatibility_weight=0.5)],
+        seed=0,
+        n_traits=4,
+    )
+    market.run()
+
+    attractiveness, compatibility = market.summary().partition_by("scenario", include_key=False)
+    assert not np.allclose(attractiveness["like_rate"], compatibility["like_rate"])
+
+
+def test_weight_without_traits_is_rejected():
+    with pytest.raises(ValueError):
+        Market(
+            n_users=200, male_ratio=0.5, n_days=3, scenarios=[Scenario(compatibility_weight=0.5)]
+        )
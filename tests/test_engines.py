@@ -0,0 +1,29 @@
+import pytest
+
+from dating_market import Scenario
+from dating_market.validation import ENGINES, compare_engines
+
+MARKET = {"n_users": 300, "male_ratio": 0.5, "n_days": 5, "seeds": [0, 1, 2, 3]}
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_engine_is_equivalent_to_reference(engine):
+    compare_engines(engine, **MARKET).assert_equivalent()
+
+
+def test_different_dynamics_are_detected():
+    comparison = compare_engines({"scenarios": [Scenario(likes_limit=5)]}, **MARKET)
+
+    assert not comparison.passed
+    with pytest.raises(AssertionError):
+        comparison.assert_equivalent()
+
+
+def test_engine_without_history_is_rejected():
+    with pytest.raises(ValueError):
+        compare_engines({"record_history": False}, **MARKET)
+
+
+def test_overlapping_seeds_are_rejected():
+    with pytest.raises(ValueError):
+        compare_engines("reference", seed_offset=1, **MARKET)
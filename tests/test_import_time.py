@@ -0,0 +1,5 @@
+from dating_market.utils import check_import_time
+
+
+def test_import_time_within_budget():
+    check_import_time()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from loguru import logger
+
+from dating_market import Market, Scenario
+
+logger.remove()
+
+
+def test_scenarios_share_random_streams_without_seed():
+    market = Market(
+        n_users=200,
+        male_ratio=0.5,
+        n_days=3,
+        scenarios=[Scenario("a"), Scenario("b")],
+    )
+    market.run()
+
+    a, b = market.get_users_data().partition_by("scenario", include_key=False)
+    assert a.equals(b)
+
+
+def test_like_rates_are_clipped_to_scenario_bounds():
+    scenario = Scenario(like_rate_mean=0.9, like_rate_std=0.2, like_rate_min=0.5, like_rate_max=1.0)
+
+    like_rates = scenario.get_like_rates(np.array([-5.0, 0.0, 5.0]))
+
+    np.testing.assert_allclose(like_rates, [0.5, 0.9, 1.0])
+
+
+def test_like_rate_mean_outside_bounds_is_rejected():
+    with pytest.raises(ValueError):
+        Scenario(like_rate_mean=0.9)